@@ -16,9 +16,28 @@ REQUEST_HEADERS = {
 # 请求超时设置（秒）
 REQUEST_TIMEOUT = 30
 
+# DNS解析缓存有效期（秒）
+DNS_CACHE_TTL = 300
+
+# 连接池配置
+HTTP_POOL_CONNECTIONS = 50  # 缓存的主机连接池数量
+HTTP_POOL_MAXSIZE = 50  # 每个主机保持的最大连接数
+HTTP_MAX_RETRIES = 2  # 连接失败时的重试次数
+
+# 文章页面缓存配置
+HTTP_CACHE_DIR = '.wx_cache'
+HTTP_CACHE_MAX_AGE = 30 * 24 * 3600  # 缓存有效期（秒），已发布的文章基本不会变化
+ARTICLE_CACHE_SIZE = 128  # 内存中缓存的已解析文章数量
+
 # 图片下载配置
 IMAGE_DOWNLOAD_TIMEOUT = 15
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
+IMAGE_DOWNLOAD_WORKERS = 16  # 并发下载图片的线程数
+
+# 批量解析公众号配置
+PROFILE_BATCH_WORKERS = 8  # 并发解析公众号的线程数
+STATS_CACHE_SIZE = 4096  # 内存中缓存的文章统计信息数量
+STATS_CACHE_TTL = 300  # 文章统计信息缓存有效期（秒）
 
 # 文件命名配置
 INVALID_FILENAME_CHARS = ['<', '>', ':', '"', '/', '\\', '|', '?', '*']
@@ -34,3 +53,7 @@ MARKDOWN_CONFIG = {
 
 # 默认输出目录
 DEFAULT_OUTPUT_DIR = 'output'
+
+# 界面日志配置
+LOG_FLUSH_INTERVAL = 100  # 日志刷新到界面的间隔（毫秒）
+LOG_MAX_LINES = 2000  # 界面中保留的最大日志行数
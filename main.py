@@ -5,7 +5,8 @@
 主程序入口
 
 使用方法:
-    python main.py
+    python main.py            启动GUI界面
+    python main.py --check    检查依赖包是否已安装
 
 功能:
     - 通过GUI界面输入微信公众号文章链接
@@ -23,23 +24,15 @@ import os
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-try:
-    from src.gui_app import WeChatArticleCollectorGUI
-except ImportError as e:
-    print(f"导入模块失败: {e}")
-    print("请确保已安装所有依赖包:")
-    print("pip install -r requirements.txt")
-    sys.exit(1)
-
 
 def check_dependencies():
     """检查依赖包是否已安装"""
     required_packages = [
         'requests',
-        'beautifulsoup4',
         'lxml',
         'html2text',
-        'Pillow'
+        'Pillow',
+        'brotli'
     ]
     
     missing_packages = []
@@ -49,12 +42,7 @@ def check_dependencies():
             __import__(package)
         except ImportError:
             # 特殊处理一些包名不一致的情况
-            if package == 'beautifulsoup4':
-                try:
-                    __import__('bs4')
-                except ImportError:
-                    missing_packages.append(package)
-            elif package == 'Pillow':
+            if package == 'Pillow':
                 try:
                     __import__('PIL')
                 except ImportError:
@@ -88,11 +76,27 @@ def create_default_directories():
 
 def main():
     """主函数"""
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print(__doc__)
+        return 0
+    
     print("微信文章采集器 (WeChatScribe) v1.0.0")
     print("=" * 50)
     
-    # 检查依赖
-    if not check_dependencies():
+    # 检查依赖（仅在指定--check时执行，正常启动时由导入失败提示）
+    if '--check' in sys.argv:
+        if not check_dependencies():
+            return 1
+        print("所有依赖包已安装")
+        return 0
+    
+    # 只有真正启动GUI时才导入界面模块
+    try:
+        from src.gui_app import WeChatArticleCollectorGUI
+    except ImportError as e:
+        print(f"导入模块失败: {e}")
+        print("请确保已安装所有依赖包:")
+        print("pip install -r requirements.txt")
         return 1
     
     # 创建默认目录
@@ -5,17 +5,69 @@
 
 import re
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from config.settings import REQUEST_HEADERS, REQUEST_TIMEOUT
+from collections import OrderedDict
+from lxml import etree, html as lxml_html
+from urllib.parse import urljoin, urlparse, urlsplit
+from config.settings import (
+    REQUEST_TIMEOUT,
+    ARTICLE_CACHE_SIZE
+)
+from http_utils import HTTPCache, create_session, normalize_url
+from html_utils import HTML_PARSER, TIME_RE, TIME_XPATHS, WS_RE, has_class
+
+
+# 无效图片链接：base64图片、gif（通常是表情或装饰）、头像、二维码、统计像素
+_INVALID_IMG_RE = re.compile(r'(?:data:image|\.gif$|avatar|qrcode|1x1\.png)', re.IGNORECASE)
+
+# 链接首尾需要去掉的控制字符和空格（与urljoin的处理一致）
+_URL_STRIP_CHARS = ''.join(map(chr, range(0x21)))
+
+# 预编译的XPath选择器，按优先级排列
+_TITLE_XPATHS = tuple(etree.XPath(x) for x in (
+    '//*[@id="activity-name"]',
+    f'//*[{has_class("rich_media_title")}]',
+    f'//h1[{has_class("rich_media_title")}]',
+    f'//h2[{has_class("rich_media_title")}]',
+    '//title',
+))
+_AUTHOR_XPATHS = tuple(etree.XPath(x) for x in (
+    '//*[@id="js_name"]',
+    f'//*[{has_class("rich_media_meta_text")}]',
+    f'//*[{has_class("profile_nickname")}]',
+    '//*[contains(@id, "author")]',
+))
+_CONTENT_XPATHS = tuple(etree.XPath(x) for x in (
+    '//*[@id="js_content"]',
+    f'//*[{has_class("rich_media_content")}]',
+    '//*[@id="js_article_container"]',
+    f'//*[{has_class("article_content")}]',
+))
+_BODY_XPATH = etree.XPath('//body')
+
+# 广告和推荐相关元素，合并为一个条件只遍历一次内容树
+_AD_XPATH = etree.XPath(
+    './/*[contains(@class, "ad") or contains(@id, "ad")'
+    ' or contains(@class, "recommend") or contains(@class, "related")'
+    f' or {has_class("qr_code_pc")} or {has_class("reward_area")}]'
+)
+
+# 清理内容时保留的属性
+_KEEP_ATTRS = frozenset(('src', 'href', 'alt', 'title', 'data-src'))
+_ATTRS_XPATH = etree.XPath('.//@*')
 
 
 class WeChatArticleParser:
     """微信公众号文章解析器"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(REQUEST_HEADERS)
+        # 复用DNS解析结果和keep-alive连接，并发下载图片时共享连接池
+        self.session = create_session()
+        
+        # 文章页面磁盘缓存
+        self.http_cache = HTTPCache()
+        
+        # 已解析文章的内存缓存（LRU）：{规范化链接: 文章信息}
+        self._article_cache = OrderedDict()
     
     def parse_article(self, url):
         """
@@ -35,27 +87,44 @@ class WeChatArticleParser:
                     'url': '原文链接'
                 }
         """
+        cache_key = normalize_url(url)
+        
+        article_info = self._article_cache.get(cache_key)
+        if article_info is not None:
+            self._article_cache.move_to_end(cache_key)
+        else:
+            article_info = self._parse_article(url)
+            self._article_cache[cache_key] = article_info
+            if len(self._article_cache) > ARTICLE_CACHE_SIZE:
+                self._article_cache.popitem(last=False)
+        
+        # 返回副本，调用方修改结果不会影响缓存
+        return dict(article_info, url=url, images=list(article_info['images']))
+    
+    def _parse_article(self, url):
+        """下载并解析文章，返回文章信息字典"""
         try:
-            # 获取文章页面
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
+            # 获取文章页面，只缓存包含正文的页面（避免缓存验证页等异常页面）
+            content = self.http_cache.fetch(
+                self.session, url, REQUEST_TIMEOUT,
+                cacheable=lambda body: b'js_content' in body
+            )
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'lxml')
+            tree = lxml_html.document_fromstring(content, parser=HTML_PARSER)
             
             # 提取文章信息
             article_info = {
                 'url': url,
-                'title': self._extract_title(soup),
-                'author': self._extract_author(soup),
-                'publish_time': self._extract_publish_time(soup),
-                'content_html': self._extract_content(soup),
+                'title': self._extract_title(tree),
+                'author': self._extract_author(tree),
+                'publish_time': self._extract_publish_time(tree),
+                'content_html': self._extract_content(tree),
                 'images': []
             }
             
             # 提取图片链接
-            article_info['images'] = self._extract_images(soup, url)
+            article_info['images'] = self._extract_images(tree, url)
             
             return article_info
             
@@ -64,168 +133,127 @@ class WeChatArticleParser:
         except Exception as e:
             raise Exception(f"文章解析失败: {str(e)}")
     
-    def _extract_title(self, soup):
+    def _extract_title(self, tree):
         """提取文章标题"""
         # 尝试多种选择器
-        selectors = [
-            '#activity-name',
-            '.rich_media_title',
-            'h1.rich_media_title',
-            'h2.rich_media_title',
-            'title'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                title = element.get_text().strip()
+        for xpath in _TITLE_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                title = elements[0].text_content().strip()
                 if title and title != '微信公众平台':
                     return self._clean_text(title)
         
         return "未知标题"
     
-    def _extract_author(self, soup):
+    def _extract_author(self, tree):
         """提取作者信息"""
-        selectors = [
-            '#js_name',
-            '.rich_media_meta_text',
-            '.profile_nickname',
-            '[id*="author"]'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                author = element.get_text().strip()
+        for xpath in _AUTHOR_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                author = elements[0].text_content().strip()
                 if author:
                     return self._clean_text(author)
         
         return "未知作者"
     
-    def _extract_publish_time(self, soup):
+    def _extract_publish_time(self, tree):
         """提取发布时间"""
-        selectors = [
-            '#publish_time',
-            '.rich_media_meta_text',
-            '[id*="time"]',
-            '[class*="time"]'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                time_text = element.get_text().strip()
+        for xpath in TIME_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                time_text = elements[0].text_content().strip()
                 # 尝试匹配时间格式
-                time_pattern = r'\d{4}-\d{2}-\d{2}|\d{4}年\d{1,2}月\d{1,2}日'
-                match = re.search(time_pattern, time_text)
+                match = TIME_RE.search(time_text)
                 if match:
                     return match.group()
         
         return ""
     
-    def _extract_content(self, soup):
+    def _extract_content(self, tree):
         """提取文章正文内容"""
         # 微信文章内容的常见选择器
-        content_selectors = [
-            '#js_content',
-            '.rich_media_content',
-            '#js_article_container',
-            '.article_content'
-        ]
-        
-        for selector in content_selectors:
-            content_element = soup.select_one(selector)
-            if content_element:
+        for xpath in _CONTENT_XPATHS:
+            elements = xpath(tree)
+            if elements:
                 # 清理不需要的元素
+                content_element = elements[0]
                 self._clean_content_element(content_element)
-                return str(content_element)
+                return self._to_html(content_element)
         
         # 如果没找到特定容器，尝试提取body内容
-        body = soup.find('body')
-        if body:
+        elements = _BODY_XPATH(tree)
+        if elements:
+            body = elements[0]
             self._clean_content_element(body)
-            return str(body)
+            return self._to_html(body)
         
         return ""
     
-    def _extract_images(self, soup, base_url):
-        """提取文章中的图片链接"""
+    def _extract_images(self, tree, base_url):
+        """提取文章中的图片链接（按出现顺序去重）"""
         images = []
+        seen_srcs = set()
+        seen_urls = set()
         
-        # 查找所有图片标签
-        img_tags = soup.find_all('img')
+        # 只解析一次基础链接，普通的相对路径直接拼接
+        base = urlsplit(base_url)
+        origin = f"{base.scheme}://{base.netloc}"
+        base_dir = origin + base.path.rsplit('/', 1)[0] + '/'
         
-        for img in img_tags:
+        # 逐个遍历图片标签，不预先生成完整列表
+        for img in tree.iter('img'):
             # 获取图片链接，优先使用data-src（懒加载）
             img_src = img.get('data-src') or img.get('src')
-            
             if img_src:
-                # 转换为绝对链接
-                if img_src.startswith('//'):
-                    img_src = 'https:' + img_src
-                elif img_src.startswith('/'):
-                    img_src = urljoin(base_url, img_src)
-                elif not img_src.startswith('http'):
-                    img_src = urljoin(base_url, img_src)
-                
-                # 过滤掉一些无用的图片
-                if self._is_valid_image_url(img_src):
-                    images.append(img_src)
+                img_src = img_src.strip(_URL_STRIP_CHARS)
+            
+            # 同一链接在懒加载标记中经常重复出现，只处理一次
+            if not img_src or img_src in seen_srcs:
+                continue
+            seen_srcs.add(img_src)
+            
+            # 转换为绝对链接
+            if img_src.startswith('//'):
+                img_src = 'https:' + img_src
+            elif img_src.startswith('http'):
+                pass
+            elif (':' in img_src or '/.' in img_src or img_src.startswith(('.', '?', '#'))
+                  or not img_src.isprintable()):
+                # 带协议、./ ../、查询参数或中间含空白控制字符的链接交给urljoin处理
+                img_src = urljoin(base_url, img_src)
+            elif img_src.startswith('/'):
+                img_src = origin + img_src
+            else:
+                img_src = base_dir + img_src
+            
+            # 过滤掉一些无用的图片
+            if img_src not in seen_urls and self._is_valid_image_url(img_src):
+                seen_urls.add(img_src)
+                images.append(img_src)
         
-        return list(set(images))  # 去重
+        return images
     
     def _clean_content_element(self, element):
         """清理内容元素，移除不需要的标签和属性"""
         # 移除脚本和样式标签
-        for tag in element.find_all(['script', 'style', 'noscript']):
-            tag.decompose()
+        etree.strip_elements(element, 'script', 'style', 'noscript', with_tail=False)
         
         # 移除广告和推荐相关的元素
-        ad_selectors = [
-            '[class*="ad"]',
-            '[id*="ad"]',
-            '[class*="recommend"]',
-            '[class*="related"]',
-            '.qr_code_pc',
-            '.reward_area'
-        ]
-        
-        for selector in ad_selectors:
-            for tag in element.select(selector):
-                tag.decompose()
+        for tag in _AD_XPATH(element):
+            tag.drop_tree()
         
-        # 清理属性，只保留必要的
-        for tag in element.find_all():
-            # 保留的属性
-            keep_attrs = ['src', 'href', 'alt', 'title', 'data-src']
-            attrs_to_remove = []
-            
-            for attr in tag.attrs:
-                if attr not in keep_attrs:
-                    attrs_to_remove.append(attr)
-            
-            for attr in attrs_to_remove:
-                del tag[attr]
+        # 清理属性，只保留必要的：先收集出现过的属性名，再一次性删除
+        attrs_to_remove = {attr.attrname for attr in _ATTRS_XPATH(element)} - _KEEP_ATTRS
+        if attrs_to_remove:
+            etree.strip_attributes(element, *attrs_to_remove)
+    
+    def _to_html(self, element):
+        """将元素序列化为HTML字符串"""
+        return etree.tostring(element, encoding='unicode', method='html', with_tail=False)
     
     def _is_valid_image_url(self, url):
         """判断是否为有效的图片链接"""
-        if not url:
-            return False
-        
-        # 过滤掉一些无用的图片
-        invalid_patterns = [
-            r'data:image',  # base64图片
-            r'\.gif$',      # gif图片（通常是表情或装饰）
-            r'avatar',      # 头像
-            r'qrcode',      # 二维码
-            r'1x1\.png',    # 统计像素
-        ]
-        
-        for pattern in invalid_patterns:
-            if re.search(pattern, url, re.IGNORECASE):
-                return False
-        
-        return True
+        return bool(url) and not _INVALID_IMG_RE.search(url)
     
     def _clean_text(self, text):
         """清理文本内容"""
@@ -233,7 +261,7 @@ class WeChatArticleParser:
             return ""
         
         # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
+        text = WS_RE.sub(' ', text)
         text = text.strip()
         
         return text
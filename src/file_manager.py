@@ -5,10 +5,26 @@
 
 import os
 import re
+import stat
+import secrets
 from datetime import datetime
 from config.settings import INVALID_FILENAME_CHARS, MAX_FILENAME_LENGTH
 
 
+# 预编译的正则表达式
+_WS_RE = re.compile(r'\s+')
+_UNDERSCORE_RE = re.compile(r'_+')
+
+# 无效字符统一替换为下划线
+_INVALID_TRANS = str.maketrans({char: '_' for char in INVALID_FILENAME_CHARS})
+
+# 文件大小单位
+_SIZE_NAMES = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# 独占创建新文件，Windows下需要二进制模式避免换行符被转换
+_CREATE_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0)
+
+
 class FileManager:
     """文件管理器"""
     
@@ -34,12 +50,19 @@ class FileManager:
             # 生成文件名
             filename = self._generate_filename(article_info)
             
-            # 确保文件名唯一
-            filepath = self._get_unique_filepath(output_dir, filename)
+            # 一次性编码，直接写入文件描述符
+            data = memoryview(markdown_content.encode('utf-8'))
+            
+            # 创建文件（文件名唯一）
+            fd, filepath = self._create_unique_file(output_dir, filename)
             
-            # 保存文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            # 保存文件（os.write可能只写入部分数据，需要循环写完）
+            try:
+                while data:
+                    written = os.write(fd, data)
+                    data = data[written:]
+            finally:
+                os.close(fd)
             
             return filepath
             
@@ -86,14 +109,13 @@ class FileManager:
             str: 清理后的文件名
         """
         # 移除无效字符
-        for char in INVALID_FILENAME_CHARS:
-            filename = filename.replace(char, '_')
+        filename = filename.translate(_INVALID_TRANS)
         
         # 移除多余的空白字符
-        filename = re.sub(r'\s+', '_', filename)
+        filename = _WS_RE.sub('_', filename)
         
         # 移除连续的下划线
-        filename = re.sub(r'_+', '_', filename)
+        filename = _UNDERSCORE_RE.sub('_', filename)
         
         # 移除首尾的下划线和点
         filename = filename.strip('_.')
@@ -104,39 +126,28 @@ class FileManager:
         
         return filename
     
-    def _get_unique_filepath(self, directory, filename):
+    def _create_unique_file(self, directory, filename):
         """
-        获取唯一的文件路径，如果文件已存在则添加序号
+        原子地创建唯一的新文件，如果文件已存在则添加随机后缀
         
         Args:
             directory (str): 目录路径
             filename (str): 文件名
             
         Returns:
-            str: 唯一的文件路径
+            tuple: (文件描述符, 文件路径)
         """
-        base_path = os.path.join(directory, filename)
-        
-        # 如果文件不存在，直接返回
-        if not os.path.exists(base_path):
-            return base_path
-        
-        # 文件已存在，添加序号
+        filepath = os.path.join(directory, filename)
         name, ext = os.path.splitext(filename)
-        counter = 1
         
-        while True:
-            new_filename = f"{name}_{counter}{ext}"
-            new_path = os.path.join(directory, new_filename)
-            
-            if not os.path.exists(new_path):
-                return new_path
-            
-            counter += 1
-            
-            # 防止无限循环
-            if counter > 9999:
-                raise Exception("无法生成唯一文件名")
+        # 随机后缀几乎不会再冲突，限制重试次数防止无限循环
+        for _ in range(10):
+            try:
+                return os.open(filepath, _CREATE_FLAGS, 0o644), filepath
+            except FileExistsError:
+                filepath = os.path.join(directory, f"{name}_{secrets.token_hex(3)}{ext}")
+        
+        raise Exception("无法生成唯一文件名")
     
     def create_directory_structure(self, base_dir, article_info):
         """
@@ -181,24 +192,28 @@ class FileManager:
             dict: 文件信息
         """
         try:
-            if not os.path.exists(filepath):
+            try:
+                file_stat = os.stat(filepath)
+            except FileNotFoundError:
                 return None
             
-            stat = os.stat(filepath)
-            
-            return {
-                'path': filepath,
-                'name': os.path.basename(filepath),
-                'size': stat.st_size,
-                'created_time': datetime.fromtimestamp(stat.st_ctime),
-                'modified_time': datetime.fromtimestamp(stat.st_mtime),
-                'is_file': os.path.isfile(filepath),
-                'is_dir': os.path.isdir(filepath)
-            }
+            return self._build_file_info(filepath, file_stat)
             
         except Exception as e:
             raise Exception(f"获取文件信息失败: {str(e)}")
     
+    def _build_file_info(self, filepath, file_stat):
+        """根据stat结果构建文件信息字典"""
+        return {
+            'path': filepath,
+            'name': os.path.basename(filepath),
+            'size': file_stat.st_size,
+            'created_time': datetime.fromtimestamp(file_stat.st_ctime),
+            'modified_time': datetime.fromtimestamp(file_stat.st_mtime),
+            'is_file': stat.S_ISREG(file_stat.st_mode),
+            'is_dir': stat.S_ISDIR(file_stat.st_mode)
+        }
+    
     def list_articles(self, directory):
         """
         列出目录中的所有文章文件
@@ -215,12 +230,16 @@ class FileManager:
             
             articles = []
             
-            for filename in os.listdir(directory):
-                if filename.endswith('.md'):
-                    filepath = os.path.join(directory, filename)
-                    file_info = self.get_file_info(filepath)
-                    if file_info:
-                        articles.append(file_info)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.md'):
+                        continue
+                    try:
+                        file_stat = entry.stat()
+                    except FileNotFoundError:
+                        # 失效的符号链接或刚被删除的文件，跳过
+                        continue
+                    articles.append(self._build_file_info(entry.path, file_stat))
             
             # 按修改时间排序（最新的在前）
             articles.sort(key=lambda x: x['modified_time'], reverse=True)
@@ -260,19 +279,26 @@ class FileManager:
             int: 目录大小（字节）
         """
         try:
-            total_size = 0
-            
-            for dirpath, dirnames, filenames in os.walk(directory):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    if os.path.exists(filepath):
-                        total_size += os.path.getsize(filepath)
-            
-            return total_size
+            return sum(self._iter_file_sizes(directory))
             
         except Exception as e:
             return 0
     
+    def _iter_file_sizes(self, directory):
+        """递归遍历目录，逐个返回文件大小"""
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            # 与os.walk一致，跳过无法访问的目录
+            return
+        
+        with entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    yield entry.stat(follow_symlinks=False).st_size
+                elif entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_file_sizes(entry.path)
+    
     def format_file_size(self, size_bytes):
         """
         格式化文件大小显示
@@ -286,14 +312,10 @@ class FileManager:
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
+        # 用二进制位数直接算出单位（每1024为一级）
+        i = min(max(int(size_bytes).bit_length() - 1, 0) // 10, len(_SIZE_NAMES) - 1)
         
-        return f"{size_bytes:.1f} {size_names[i]}"
+        return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_NAMES[i]}"
 
 
 def test_file_manager():
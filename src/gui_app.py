@@ -4,16 +4,107 @@
 """
 
 import os
+import re
+import sys
+import queue
 import threading
+import subprocess
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlparse
 
 from article_parser import WeChatArticleParser
 from markdown_converter import MarkdownConverter
 from file_manager import FileManager
 from wechat_profile_parser import WeChatProfileParser
-from config.settings import DEFAULT_OUTPUT_DIR
+from config.settings import DEFAULT_OUTPUT_DIR, LOG_FLUSH_INTERVAL, LOG_MAX_LINES
+
+
+# 打开目录使用的系统命令，Windows下使用os.startfile
+if sys.platform == 'win32':
+    _OPEN_COMMAND = None
+elif sys.platform == 'darwin':
+    _OPEN_COMMAND = 'open'
+else:
+    _OPEN_COMMAND = 'xdg-open'
+
+# 标准微信公众号文章链接
+_HIGH_CONFIDENCE_PATTERNS = (
+    r'https?://mp\.weixin\.qq\.com/s/',
+    r'https?://mp\.weixin\.qq\.com/s\?',
+)
+
+# 更全面的微信文章URL模式
+_WECHAT_URL_PATTERNS = _HIGH_CONFIDENCE_PATTERNS + (
+    # 微信内部链接
+    r'https?://weixin\.qq\.com/',
+    # 短链接形式
+    r'https?://.*\.weixin\.qq\.com/',
+    # 包含__biz参数的链接（微信文章特有）
+    r'__biz=',
+    # 包含mid参数的链接
+    r'mid=',
+    # 包含sn参数的链接（微信文章特有）
+    r'sn=',
+)
+
+# 微信文章链接中的关键参数
+_WECHAT_PARAMS = frozenset(('__biz', 'mid', 'sn', 'idx'))
+
+# 微信相关域名
+_WECHAT_DOMAINS = ('weixin.qq.com', 'wx.qq.com', 'mp.weixin.qq.com')
+
+# 合并为单个预编译的正则，每次验证只扫描一遍
+_HIGH_CONFIDENCE_RE = re.compile('|'.join(_HIGH_CONFIDENCE_PATTERNS))
+_WECHAT_URL_RE = re.compile('|'.join(_WECHAT_URL_PATTERNS))
+
+
+@lru_cache(maxsize=256)
+def _validate_wechat_url(url):
+    """
+    验证URL并返回置信度和原因，结果按链接缓存
+    
+    Returns:
+        tuple: (置信度, 原因说明)
+    """
+    url = url.strip()
+    
+    # 基本格式检查
+    if not url:
+        return 'invalid', '链接为空'
+    
+    if not url.startswith(('http://', 'https://')):
+        return 'invalid', '链接必须以http://或https://开头'
+    
+    try:
+        parsed = urlparse(url)
+        if not parsed.netloc:
+            return 'invalid', '链接格式不正确'
+    except Exception:
+        return 'invalid', '链接格式不正确'
+    
+    url_lower = url.lower()
+    
+    # 高置信度：标准微信文章链接
+    if _HIGH_CONFIDENCE_RE.search(url_lower):
+        return 'high', '标准微信文章链接'
+    
+    # 中等置信度：包含微信特有参数
+    if any(param in url_lower for param in _WECHAT_PARAMS):
+        return 'high', '包含微信文章参数'
+    
+    # 中等置信度：微信相关域名（按主机名后缀匹配，忽略端口）
+    domain = parsed.hostname or ''
+    if domain.endswith(_WECHAT_DOMAINS):
+        return 'medium', '微信相关域名'
+    
+    # 低置信度：其他HTTP链接
+    if url_lower.startswith(('http://', 'https://')):
+        return 'low', '非微信域名，但可能是有效链接'
+    
+    return 'invalid', '不是有效的网页链接'
 
 
 class WeChatArticleCollectorGUI:
@@ -35,6 +126,10 @@ class WeChatArticleCollectorGUI:
         # 工作线程
         self.worker_thread = None
         self.is_working = False
+        
+        # 工作线程写入日志队列，主线程定时批量取出显示
+        self._log_queue = queue.Queue()
+        self.root.after(LOG_FLUSH_INTERVAL, self._drain_log_queue)
     
     def setup_window(self):
         """设置窗口属性"""
@@ -222,24 +317,51 @@ class WeChatArticleCollectorGUI:
     def open_output_directory(self):
         """打开输出目录"""
         output_dir = self.output_dir_var.get()
-        if os.path.exists(output_dir):
-            os.startfile(output_dir)
-        else:
+        if not os.path.isdir(output_dir):
             messagebox.showwarning("警告", "输出目录不存在")
+            return
+        
+        try:
+            if _OPEN_COMMAND is None:
+                os.startfile(output_dir)
+            else:
+                subprocess.Popen([_OPEN_COMMAND, output_dir], close_fds=True)
+        except OSError as e:
+            messagebox.showerror("错误", f"无法打开输出目录:\n{e}")
     
     def log_message(self, message, level="INFO"):
         """记录日志消息"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {level}: {message}\n"
         
-        # 在主线程中更新GUI
-        self.root.after(0, self._append_log, log_entry)
+        # 放入队列，由主线程批量更新GUI
+        self._log_queue.put(log_entry)
     
-    def _append_log(self, log_entry):
-        """在主线程中添加日志"""
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+    def _drain_log_queue(self):
+        """定时在主线程中显示待显示的日志"""
+        self._flush_log_queue()
+        self.root.after(LOG_FLUSH_INTERVAL, self._drain_log_queue)
+    
+    def _flush_log_queue(self):
+        """在主线程中取出所有待显示的日志，一次性添加到日志框"""
+        entries = []
+        while True:
+            try:
+                entries.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if entries:
+            self.log_text.insert(tk.END, ''.join(entries))
+            
+            # 只保留最近的LOG_MAX_LINES行，避免长时间运行后控件越来越慢
+            # 日志以换行结尾，'end-1c'位于最后一行之后的空行
+            line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            if line_count > LOG_MAX_LINES:
+                self.log_text.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
+            
+            # 只滚动到末尾，重绘交给Tk的空闲循环合并处理
+            self.log_text.see(tk.END)
     
     def update_status(self, status):
         """更新状态"""
@@ -323,10 +445,12 @@ class WeChatArticleCollectorGUI:
             self.update_progress(10)
             self.log_message("开始解析文章...")
             
-            # 解析文章
+            # 解析文章，然后在后台开始下载图片
             article_info = self.parser.parse_article(url)
+            image_downloads = self.converter.prefetch_images(article_info['images'], output_dir)
             
             if not self.is_working:
+                self.converter.cancel_downloads(image_downloads)
                 return
             
             self.update_progress(30)
@@ -341,7 +465,7 @@ class WeChatArticleCollectorGUI:
             self.log_message("开始转换为Markdown格式...")
             
             markdown_content = self.converter.convert_to_markdown(
-                article_info, output_dir
+                article_info, output_dir, image_downloads=image_downloads
             )
             
             if not self.is_working:
@@ -439,8 +563,11 @@ class WeChatArticleCollectorGUI:
                     self.log_message(f"正在处理第 {i+1}/{total_articles} 篇文章: {article_info['title']}")
                     self.update_status(f"正在处理第 {i+1}/{total_articles} 篇文章...")
                     
-                    # 获取文章详细内容
+                    # 获取文章详细内容，然后在后台开始下载图片
                     detailed_article = self.parser.parse_article(article_info['url'])
+                    image_downloads = self.converter.prefetch_images(
+                        detailed_article['images'], output_dir
+                    )
                     
                     # 合并文章信息
                     detailed_article.update({
@@ -450,11 +577,12 @@ class WeChatArticleCollectorGUI:
                     })
                     
                     if not self.is_working:
+                        self.converter.cancel_downloads(image_downloads)
                         break
                     
                     # 转换为Markdown
                     markdown_content = self.converter.convert_to_markdown(
-                        detailed_article, output_dir
+                        detailed_article, output_dir, image_downloads=image_downloads
                     )
                     
                     if not self.is_working:
@@ -503,31 +631,16 @@ class WeChatArticleCollectorGUI:
         self.collect_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         
+        # 立即显示剩余的日志，并只在结束时强制刷新一次界面
+        self._flush_log_queue()
+        self.root.update_idletasks()
+        
         if self.progress_var.get() < 100:
             self.update_progress(0)
             self.update_status("就绪")
     
     def is_valid_wechat_url(self, url):
         """验证是否为有效的微信文章URL"""
-        import re
-        
-        # 更全面的微信文章URL模式
-        wechat_patterns = [
-            # 标准微信公众号文章链接
-            r'https?://mp\.weixin\.qq\.com/s/',
-            r'https?://mp\.weixin\.qq\.com/s\?',
-            # 微信内部链接
-            r'https?://weixin\.qq\.com/',
-            # 短链接形式
-            r'https?://.*\.weixin\.qq\.com/',
-            # 包含__biz参数的链接（微信文章特有）
-            r'.*__biz=.*',
-            # 包含mid参数的链接
-            r'.*mid=.*',
-            # 包含sn参数的链接（微信文章特有）
-            r'.*sn=.*'
-        ]
-        
         url_lower = url.lower().strip()
         
         # 基本URL格式检查
@@ -535,15 +648,12 @@ class WeChatArticleCollectorGUI:
             return False
         
         # 检查是否匹配微信文章模式
-        for pattern in wechat_patterns:
-            if re.search(pattern, url_lower):
-                return True
+        if _WECHAT_URL_RE.search(url_lower):
+            return True
         
         # 如果包含微信相关的关键参数，也认为是有效的
-        wechat_params = ['__biz', 'mid', 'sn', 'idx']
-        for param in wechat_params:
-            if param in url_lower:
-                return True
+        if any(param in url_lower for param in _WECHAT_PARAMS):
+            return True
         
         return False
     
@@ -557,63 +667,8 @@ class WeChatArticleCollectorGUI:
                 'reason': '原因说明'
             }
         """
-        import re
-        from urllib.parse import urlparse, parse_qs
-        
-        url = url.strip()
-        
-        # 基本格式检查
-        if not url:
-            return {'confidence': 'invalid', 'reason': '链接为空'}
-        
-        if not url.startswith(('http://', 'https://')):
-            return {'confidence': 'invalid', 'reason': '链接必须以http://或https://开头'}
-        
-        try:
-            parsed = urlparse(url)
-            if not parsed.netloc:
-                return {'confidence': 'invalid', 'reason': '链接格式不正确'}
-        except Exception:
-            return {'confidence': 'invalid', 'reason': '链接格式不正确'}
-        
-        url_lower = url.lower()
-        
-        # 高置信度：标准微信文章链接
-        high_confidence_patterns = [
-            r'https?://mp\.weixin\.qq\.com/s/',
-            r'https?://mp\.weixin\.qq\.com/s\?'
-        ]
-        
-        for pattern in high_confidence_patterns:
-            if re.search(pattern, url_lower):
-                return {'confidence': 'high', 'reason': '标准微信文章链接'}
-        
-        # 中等置信度：包含微信特有参数
-        wechat_params = ['__biz', 'sn', 'mid', 'idx']
-        has_wechat_params = any(param in url_lower for param in wechat_params)
-        
-        if has_wechat_params:
-            return {'confidence': 'high', 'reason': '包含微信文章参数'}
-        
-        # 中等置信度：微信相关域名
-        wechat_domains = [
-            'weixin.qq.com',
-            'wx.qq.com',
-            'mp.weixin.qq.com'
-        ]
-        
-        parsed_url = urlparse(url_lower)
-        domain = parsed_url.netloc
-        
-        for wechat_domain in wechat_domains:
-            if wechat_domain in domain:
-                return {'confidence': 'medium', 'reason': '微信相关域名'}
-        
-        # 低置信度：其他HTTP链接
-        if url_lower.startswith(('http://', 'https://')):
-            return {'confidence': 'low', 'reason': '非微信域名，但可能是有效链接'}
-        
-        return {'confidence': 'invalid', 'reason': '不是有效的网页链接'}
+        confidence, reason = _validate_wechat_url(url)
+        return {'confidence': confidence, 'reason': reason}
     
     def on_closing(self):
         """窗口关闭事件"""
@@ -624,6 +679,9 @@ class WeChatArticleCollectorGUI:
             
             self.is_working = False
         
+        # 丢弃排队中的图片下载，退出时不必等它们完成
+        self.converter.shutdown()
+        
         self.root.destroy()
     
     def run(self):
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+HTML解析工具模块
+文章解析器和公众号解析器共用的解析器、正则表达式和XPath选择器
+"""
+
+import re
+from lxml import etree, html as lxml_html
+
+
+# 微信页面固定为UTF-8编码，直接交给lxml解码原始字节
+HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+# 预编译的正则表达式
+TIME_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{4}年\d{1,2}月\d{1,2}日')
+WS_RE = re.compile(r'\s+')
+
+
+def has_class(name):
+    """生成匹配class中某个完整类名的XPath条件"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# 发布时间的XPath选择器，按优先级排列
+TIME_XPATHS = tuple(etree.XPath(x) for x in (
+    '//*[@id="publish_time"]',
+    f'//*[{has_class("rich_media_meta_text")}]',
+    '//*[contains(@id, "time")]',
+    '//*[contains(@class, "time")]',
+))
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP连接工具模块
+"""
+
+import os
+import json
+import socket
+import time
+import hashlib
+import requests
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+from config.settings import (
+    REQUEST_HEADERS,
+    DNS_CACHE_TTL,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MAX_AGE
+)
+
+
+# 进程内DNS缓存：{主机名: (IP地址列表, 过期时间)}
+_DNS_CACHE = {}
+
+# 服务器临时故障时重试的状态码
+_RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# 不影响文章内容的分享/统计参数
+_TRACKING_PARAMS = frozenset((
+    'chksm', 'scene', 'srcid', 'sharer_sharetime', 'sharer_shareid',
+    'from', 'isappinstalled', 'clicktime', 'enterid', 'ascene',
+    'devicetype', 'version', 'nettype', 'lang', 'exportkey',
+    'pass_ticket', 'wx_header', 'mpshare',
+))
+
+
+def normalize_url(url):
+    """
+    规范化文章链接，去掉分享和统计参数，用作缓存键
+    
+    Args:
+        url (str): 原始链接
+        
+    Returns:
+        str: 规范化后的链接
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in _TRACKING_PARAMS
+    )
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+def _resolve_cached(host, port):
+    """
+    解析主机名，结果在DNS_CACHE_TTL秒内复用
+    
+    Args:
+        host (str): 主机名
+        port (int): 端口
+    
+    Returns:
+        list: 按解析结果顺序排列的IP地址（已去重），解析失败返回None
+    """
+    now = time.monotonic()
+    cached = _DNS_CACHE.get(host)
+    if cached and cached[1] > now:
+        return cached[0]
+    
+    try:
+        addr_info = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+    except OSError:
+        return None
+    
+    if not addr_info:
+        return None
+    
+    addresses = list(dict.fromkeys(info[4][0] for info in addr_info))
+    _DNS_CACHE[host] = (addresses, now + DNS_CACHE_TTL)
+    return addresses
+
+
+class _CachedResolverMixin:
+    """建立新连接时使用缓存的DNS解析结果"""
+    
+    def _new_conn(self):
+        # 只在建立socket时替换为IP，TLS握手的SNI和证书校验仍使用原主机名
+        host = self._dns_host
+        addresses = _resolve_cached(host, self.port)
+        if addresses is None:
+            return super()._new_conn()
+        
+        # 与urllib3自行解析时一样，依次尝试每个地址，直到连接成功
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError as e:
+                    error = e
+        finally:
+            self._dns_host = host
+        
+        # 所有缓存的地址都连不上时丢弃，下次重新解析
+        _DNS_CACHE.pop(host, None)
+        raise error
+
+
+class _CachedResolverHTTPConnection(_CachedResolverMixin, HTTPConnection):
+    pass
+
+
+class _CachedResolverHTTPSConnection(_CachedResolverMixin, HTTPSConnection):
+    pass
+
+
+class _CachedResolverHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedResolverHTTPConnection
+
+
+class _CachedResolverHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedResolverHTTPSConnection
+
+
+class CachedResolverAdapter(HTTPAdapter):
+    """带DNS解析缓存的HTTP适配器"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CachedResolverHTTPConnectionPool,
+            'https': _CachedResolverHTTPSConnectionPool,
+        }
+
+
+def create_session():
+    """
+    创建HTTP会话
+    
+    挂载带DNS缓存的连接池适配器，复用keep-alive连接，
+    连接失败和服务器临时故障（5xx）时自动重试。
+    
+    Returns:
+        requests.Session: HTTP会话
+    """
+    session = requests.Session()
+    session.headers.update(REQUEST_HEADERS)
+    
+    adapter = CachedResolverAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=0.2,
+            status_forcelist=_RETRY_STATUS_CODES
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    
+    return session
+
+
+class HTTPCache:
+    """
+    页面响应的磁盘缓存
+    
+    有效期内直接返回缓存内容；过期后携带ETag/Last-Modified发起条件请求，
+    服务器返回304时继续使用缓存内容。
+    """
+    
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_age=HTTP_CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+    
+    def fetch(self, session, url, timeout, cacheable=None):
+        """
+        获取页面内容
+        
+        Args:
+            session (requests.Session): HTTP会话
+            url (str): 页面链接
+            timeout (int): 请求超时（秒）
+            cacheable (callable): 判断响应内容是否可以缓存，为None时缓存所有200响应
+            
+        Returns:
+            bytes: 页面内容
+        """
+        key = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+        meta = self._load_meta(key)
+        
+        headers = {}
+        if meta is not None:
+            if time.time() - meta['fetched_at'] < self.max_age:
+                content = self._load_body(key)
+                if content is not None:
+                    return content
+            
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        
+        response = session.get(url, headers=headers, timeout=timeout)
+        
+        if response.status_code == 304 and meta is not None:
+            content = self._load_body(key)
+            if content is not None:
+                meta['fetched_at'] = time.time()
+                self._store(key, meta, None)
+                return content
+            # 缓存文件丢失，重新完整请求
+            response = session.get(url, timeout=timeout)
+        
+        response.raise_for_status()
+        content = response.content
+        
+        if response.status_code == 200 and (cacheable is None or cacheable(content)):
+            meta = {
+                'url': url,
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+                'fetched_at': time.time(),
+            }
+            self._store(key, meta, content)
+        
+        return content
+    
+    def _load_meta(self, key):
+        """读取缓存元信息，不存在或损坏时返回None"""
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _load_body(self, key):
+        """读取缓存的页面内容，不存在时返回None"""
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.html"), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _store(self, key, meta, content):
+        """写入缓存，先写临时文件再替换，避免并发读到不完整的内容"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            
+            if content is not None:
+                body_path = os.path.join(self.cache_dir, f"{key}.html")
+                with open(body_path + '.tmp', 'wb') as f:
+                    f.write(content)
+                os.replace(body_path + '.tmp', body_path)
+            
+            meta_path = os.path.join(self.cache_dir, f"{key}.json")
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_path + '.tmp', meta_path)
+            
+        except OSError as e:
+            # 缓存写入失败不影响正常流程
+            print(f"写入缓存失败 {meta.get('url')}: {e}")
@@ -5,44 +5,134 @@ Markdown转换模块
 
 import os
 import re
+import shutil
+import hashlib
 import html2text
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse, urljoin
-from PIL import Image
 from config.settings import (
     MARKDOWN_CONFIG, 
     IMAGE_DOWNLOAD_TIMEOUT, 
-    MAX_IMAGE_SIZE,
-    REQUEST_HEADERS
+    IMAGE_DOWNLOAD_WORKERS,
+    MAX_IMAGE_SIZE
 )
+from http_utils import create_session
+
+
+# html2text转换器配置
+_H2T_OPTIONS = {
+    'body_width': MARKDOWN_CONFIG['body_width'],
+    'unicode_snob': MARKDOWN_CONFIG['unicode_snob'],
+    'escape_snob': MARKDOWN_CONFIG['escape_snob'],
+    'mark_code': MARKDOWN_CONFIG['mark_code'],
+    
+    # 其他配置
+    'ignore_links': False,
+    'ignore_images': False,
+    'ignore_emphasis': False,
+    'skip_internal_links': True,
+    'inline_links': True,
+    'protect_links': True,
+    'wrap_links': False,
+}
+
+# 清理Markdown用的正则：行尾空白（不含换行）、连续两个以上的空行
+_TRAILING_WS_RE = re.compile(r'[^\S\n]+(?=\n)')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# 保存图片时的复制缓冲区大小
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+# Content-Type到文件扩展名的映射
+_CONTENT_TYPE_EXTS = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+# 链接中没有扩展名时，查找已下载文件使用的扩展名
+_IMAGE_EXTS = ('.jpg', '.png', '.gif', '.webp')
+
+
+class _ImageTooLarge(Exception):
+    """图片超过大小限制"""
+
+
+class _SizeLimitedReader:
+    """包装文件对象，累计读取的字节数超过上限时抛出_ImageTooLarge"""
+    
+    def __init__(self, raw, limit):
+        self.raw = raw
+        self.limit = limit
+        self.total = 0
+    
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.total += len(data)
+        if self.total > self.limit:
+            raise _ImageTooLarge()
+        return data
 
 
 class MarkdownConverter:
     """HTML到Markdown转换器"""
     
     def __init__(self):
-        self.h2t = html2text.HTML2Text()
-        self._configure_html2text()
-        self.session = requests.Session()
-        self.session.headers.update(REQUEST_HEADERS)
+        # 连接池足够容纳并发下载的线程，CDN临时故障时自动重试
+        self.session = create_session()
+        
+        # 下载图片的线程池，在多篇文章之间复用（线程按需创建），预取和转换共用，
+        # 同时进行的下载数不超过线程池大小
+        self._executor = ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS)
+        
+        # 已创建过的图片目录
+        self._created_dirs = set()
+    
+    def _ensure_dir(self, directory):
+        """创建目录，同一目录只创建一次"""
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
     
-    def _configure_html2text(self):
-        """配置html2text转换器"""
-        self.h2t.body_width = MARKDOWN_CONFIG['body_width']
-        self.h2t.unicode_snob = MARKDOWN_CONFIG['unicode_snob']
-        self.h2t.escape_snob = MARKDOWN_CONFIG['escape_snob']
-        self.h2t.mark_code = MARKDOWN_CONFIG['mark_code']
+    @staticmethod
+    def _make_h2t():
+        """
+        创建配置好的html2text转换器
         
-        # 其他配置
-        self.h2t.ignore_links = False
-        self.h2t.ignore_images = False
-        self.h2t.ignore_emphasis = False
-        self.h2t.skip_internal_links = True
-        self.h2t.inline_links = True
-        self.h2t.protect_links = True
-        self.h2t.wrap_links = False
+        html2text实例在转换过程中保存内部状态，不能在多篇文章或多个线程之间共用，
+        因此每次转换都使用新实例，配置项在模块加载时只计算一次。
+        """
+        h2t = html2text.HTML2Text()
+        for name, value in _H2T_OPTIONS.items():
+            setattr(h2t, name, value)
+        return h2t
     
-    def convert_to_markdown(self, article_info, output_dir, images_dir="images"):
+    def prefetch_images(self, image_urls, output_dir, images_dir="images"):
+        """
+        在后台开始下载图片，与后续的Markdown转换同时进行
+        
+        每个任务完整地下载并保存一张图片，本地已下载过的图片不再请求。
+        
+        Args:
+            image_urls (list): 图片URL列表
+            output_dir (str): 输出目录
+            images_dir (str): 图片子目录名
+            
+        Returns:
+            dict: {图片URL: Future[本地文件名]}，传给convert_to_markdown的image_downloads参数；
+                  下载失败时结果为None
+        """
+        full_images_dir = os.path.join(output_dir, images_dir)
+        self._ensure_dir(full_images_dir)
+        return {
+            img_url: self._executor.submit(self._download_image, img_url, full_images_dir)
+            for img_url in dict.fromkeys(image_urls)
+        }
+    
+    def convert_to_markdown(self, article_info, output_dir, images_dir="images", image_downloads=None):
         """
         将文章信息转换为Markdown格式
         
@@ -50,6 +140,7 @@ class MarkdownConverter:
             article_info (dict): 文章信息字典
             output_dir (str): 输出目录
             images_dir (str): 图片子目录名
+            image_downloads (dict): prefetch_images返回的 {图片URL: Future[本地文件名]}，可选
             
         Returns:
             str: Markdown内容
@@ -57,31 +148,35 @@ class MarkdownConverter:
         try:
             # 创建图片目录
             full_images_dir = os.path.join(output_dir, images_dir)
-            os.makedirs(full_images_dir, exist_ok=True)
+            self._ensure_dir(full_images_dir)
             
             # 下载图片并更新HTML中的图片链接
             updated_html = self._download_and_update_images(
                 article_info['content_html'], 
                 article_info['images'], 
                 full_images_dir,
-                images_dir
+                images_dir,
+                image_downloads
             )
             
-            # 转换为Markdown
-            markdown_content = self.h2t.handle(updated_html)
+            # 转换为Markdown，并清理和格式化
+            markdown_content = self._clean_markdown(self._make_h2t().handle(updated_html))
             
-            # 添加文章元信息头部
-            markdown_with_meta = self._add_metadata_header(article_info, markdown_content)
+            # 元信息头部与正文之间最多保留一个空行
+            if markdown_content.startswith('\n\n'):
+                markdown_content = markdown_content[1:]
             
-            # 清理和格式化Markdown
-            final_markdown = self._clean_markdown(markdown_with_meta)
+            # 添加文章元信息头部，一次拼接出完整文档
+            metadata_lines = self._build_metadata_header(article_info)
+            metadata_lines.append(markdown_content)
             
-            return final_markdown
+            return '\n'.join(metadata_lines)
             
         except Exception as e:
             raise Exception(f"Markdown转换失败: {str(e)}")
     
-    def _download_and_update_images(self, html_content, image_urls, images_dir, relative_images_dir):
+    def _download_and_update_images(self, html_content, image_urls, images_dir, relative_images_dir,
+                                    image_downloads=None):
         """
         下载图片并更新HTML中的图片链接
         
@@ -90,118 +185,194 @@ class MarkdownConverter:
             image_urls (list): 图片URL列表
             images_dir (str): 图片保存的绝对路径
             relative_images_dir (str): 图片的相对路径（用于Markdown引用）
+            image_downloads (dict): 已在后台开始的下载 {图片URL: Future[本地文件名]}，可选
             
         Returns:
             str: 更新后的HTML内容
         """
         updated_html = html_content
+        image_downloads = image_downloads or {}
+        
+        # 同一图片可能被引用多次，按出现顺序去重后只下载一次
+        image_urls = list(dict.fromkeys(image_urls))
+        if not image_urls:
+            return updated_html
+        
+        # 图片下载是网络I/O，彼此独立，并发下载后再统一替换链接；
+        # 已在后台开始的下载直接等待其结果
+        local_filenames = {}
+        futures = {}
+        for img_url in image_urls:
+            future = image_downloads.get(img_url)
+            if future is None:
+                future = self._executor.submit(self._download_image, img_url, images_dir)
+            futures[future] = img_url
         
-        for i, img_url in enumerate(image_urls):
+        for future in as_completed(futures):
+            img_url = futures[future]
             try:
-                # 下载图片
-                local_filename = self._download_image(img_url, images_dir, i)
-                
-                if local_filename:
-                    # 构建相对路径
-                    relative_path = f"{relative_images_dir}/{local_filename}"
-                    
-                    # 更新HTML中的图片链接
-                    # 处理各种可能的图片标签格式
-                    patterns = [
-                        rf'src="{re.escape(img_url)}"',
-                        rf"src='{re.escape(img_url)}'",
-                        rf'data-src="{re.escape(img_url)}"',
-                        rf"data-src='{re.escape(img_url)}'"
-                    ]
-                    
-                    for pattern in patterns:
-                        updated_html = re.sub(
-                            pattern, 
-                            f'src="{relative_path}"', 
-                            updated_html
-                        )
-                        
+                local_filenames[img_url] = future.result()
             except Exception as e:
                 print(f"下载图片失败 {img_url}: {e}")
-                continue
+        
+        # 图片链接到替换后属性的映射，替换文本预先生成，每次匹配只需查表
+        replacements = {
+            img_url: f'src="{relative_images_dir}/{local_filenames[img_url]}"'
+            for img_url in image_urls
+            if local_filenames.get(img_url)
+        }
+        if not replacements:
+            return updated_html
+        
+        # 一次扫描替换所有src/data-src（单引号或双引号）中的图片链接，每个链接只转义一次
+        image_link_re = re.compile(
+            r'(src|data-src)=(["\'])(' + '|'.join(map(re.escape, replacements)) + r')\2'
+        )
+        updated_html = image_link_re.sub(
+            lambda match: replacements[match.group(3)],
+            updated_html
+        )
         
         return updated_html
     
-    def _download_image(self, img_url, images_dir, index):
+    def _download_image(self, img_url, images_dir):
         """
         下载单个图片
         
+        文件名由图片链接的哈希生成，目录中已存在同名文件时直接复用，不再发起请求。
+        
         Args:
             img_url (str): 图片URL
             images_dir (str): 保存目录
-            index (int): 图片索引
             
         Returns:
             str: 本地文件名，失败返回None
         """
         try:
+            # 获取文件扩展名
+            parsed_url = urlparse(img_url)
+            path = parsed_url.path
+            ext = os.path.splitext(path)[1].lower()
+            
+            # 检查之前是否已下载过（没有扩展名时逐个检查可能的扩展名）
+            name = hashlib.sha1(img_url.encode('utf-8')).hexdigest()[:16]
+            for candidate in ([name + ext] if ext else [name + e for e in _IMAGE_EXTS]):
+                try:
+                    if os.path.getsize(os.path.join(images_dir, candidate)) > 0:
+                        return candidate
+                except OSError:
+                    pass
+            
+            # 先用HEAD请求检查大小，过大的图片不必传输正文
+            if self._exceeds_size_limit(img_url):
+                print(f"图片过大，跳过: {img_url}")
+                return None
+            
             response = self.session.get(img_url, timeout=IMAGE_DOWNLOAD_TIMEOUT, stream=True)
-            response.raise_for_status()
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                # 错误响应同样要关闭，释放连接
+                response.close()
+                raise
             
             # 检查文件大小
             content_length = response.headers.get('content-length')
             if content_length and int(content_length) > MAX_IMAGE_SIZE:
                 print(f"图片过大，跳过: {img_url}")
+                response.close()
                 return None
             
-            # 获取文件扩展名
-            parsed_url = urlparse(img_url)
-            path = parsed_url.path
-            ext = os.path.splitext(path)[1].lower()
-            
-            # 如果没有扩展名，尝试从Content-Type获取
+            # 如果没有扩展名，尝试从Content-Type获取（忽略charset等参数），默认为.jpg
             if not ext:
                 content_type = response.headers.get('content-type', '')
-                if 'jpeg' in content_type or 'jpg' in content_type:
-                    ext = '.jpg'
-                elif 'png' in content_type:
-                    ext = '.png'
-                elif 'gif' in content_type:
-                    ext = '.gif'
-                elif 'webp' in content_type:
-                    ext = '.webp'
-                else:
-                    ext = '.jpg'  # 默认扩展名
+                mime_type = content_type.split(';', 1)[0].strip().lower()
+                ext = _CONTENT_TYPE_EXTS.get(mime_type, '.jpg')
             
-            # 生成文件名
-            filename = f"image_{index:03d}{ext}"
+            # 生成文件名，先写入临时文件，验证通过后再改名，
+            # 避免中断的下载留下不完整的文件被当作已下载
+            filename = name + ext
             filepath = os.path.join(images_dir, filename)
+            temp_path = filepath + '.part'
             
-            # 保存图片
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # 保存图片：大块缓冲直接从原始连接复制到文件
+            # Content-Length经常缺失，复制时再按实际字节数限制大小
+            response.raw.decode_content = True
+            try:
+                try:
+                    f = open(temp_path, 'wb', buffering=_COPY_BUFFER_SIZE)
+                except FileNotFoundError:
+                    # 图片目录在程序运行期间被删除，重新创建后再试一次
+                    os.makedirs(images_dir, exist_ok=True)
+                    f = open(temp_path, 'wb', buffering=_COPY_BUFFER_SIZE)
+                with f:
+                    shutil.copyfileobj(
+                        _SizeLimitedReader(response.raw, MAX_IMAGE_SIZE), f, _COPY_BUFFER_SIZE
+                    )
+            except _ImageTooLarge:
+                print(f"图片过大，跳过: {img_url}")
+                os.remove(temp_path)
+                return None
+            finally:
+                response.close()
             
-            # 验证图片文件
+            # 验证图片文件：只解析文件头，能识别格式和尺寸即视为有效图片
+            # 在第一次需要时才导入Pillow，没有图片的文章不必加载
+            from PIL import Image, UnidentifiedImageError
             try:
-                with Image.open(filepath) as img:
-                    img.verify()
-                return filename
-            except Exception:
+                with Image.open(temp_path) as img:
+                    if not img.format or not all(img.size):
+                        raise ValueError("无效的图片尺寸")
+            except (UnidentifiedImageError, OSError, ValueError):
                 # 如果不是有效图片，删除文件
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
                 return None
+            
+            os.replace(temp_path, filepath)
+            return filename
                 
         except Exception as e:
             print(f"下载图片失败 {img_url}: {e}")
             return None
     
-    def _add_metadata_header(self, article_info, markdown_content):
+    def _exceeds_size_limit(self, img_url):
+        """用HEAD请求检查图片是否超过大小限制，请求失败或没有返回大小时视为未超过"""
+        try:
+            head = self.session.head(img_url, timeout=IMAGE_DOWNLOAD_TIMEOUT, allow_redirects=True)
+        except requests.RequestException:
+            return False
+        
+        content_length = head.headers.get('content-length', '')
+        return content_length.isdigit() and int(content_length) > MAX_IMAGE_SIZE
+    
+    def shutdown(self):
         """
-        添加文章元信息头部
+        停止下载图片的线程池，丢弃排队中的任务
+        
+        退出程序时调用，不必等待所有排队的图片下载完成。
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def cancel_downloads(self, image_downloads):
+        """
+        取消尚未开始的后台下载（例如用户停止了采集），进行中的下载会自行完成并保存
+        
+        Args:
+            image_downloads (dict): prefetch_images返回的 {图片URL: Future[本地文件名]}
+        """
+        for future in image_downloads.values():
+            future.cancel()
+    
+    def _build_metadata_header(self, article_info):
+        """
+        生成文章元信息头部
         
         Args:
             article_info (dict): 文章信息
-            markdown_content (str): Markdown内容
             
         Returns:
-            str: 带有元信息头部的Markdown
+            list: 元信息头部的各行
         """
         metadata_lines = [
             "---",
@@ -215,10 +386,9 @@ class MarkdownConverter:
         metadata_lines.extend([
             f"source: \"{article_info['url']}\"",
             "---",
-            "",
         ])
         
-        return "\n".join(metadata_lines) + markdown_content
+        return metadata_lines
     
     def _clean_markdown(self, markdown_content):
         """
@@ -230,23 +400,15 @@ class MarkdownConverter:
         Returns:
             str: 清理后的Markdown内容
         """
-        # 移除多余的空行
-        markdown_content = re.sub(r'\n\s*\n\s*\n', '\n\n', markdown_content)
-        
-        # 清理行首行尾空白
-        lines = []
-        for line in markdown_content.split('\n'):
-            lines.append(line.rstrip())
+        # 清理行尾空白
+        markdown_content = _TRAILING_WS_RE.sub('', markdown_content)
         
-        # 移除文档末尾的多余空行
-        while lines and not lines[-1].strip():
-            lines.pop()
-        
-        # 确保文档以换行符结尾
-        if lines:
-            lines.append('')
+        # 移除多余的空行
+        markdown_content = _BLANK_LINES_RE.sub('\n\n', markdown_content)
         
-        return '\n'.join(lines)
+        # 移除文档末尾的空白，并确保文档以换行符结尾
+        markdown_content = markdown_content.rstrip()
+        return markdown_content + '\n' if markdown_content else ''
 
 
 def test_converter():
@@ -6,18 +6,194 @@
 
 import re
 import json
-import requests
-from bs4 import BeautifulSoup
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree, html as lxml_html
 from urllib.parse import urljoin, urlparse, parse_qs
-from config.settings import REQUEST_HEADERS, REQUEST_TIMEOUT
+from config.settings import (
+    REQUEST_TIMEOUT,
+    PROFILE_BATCH_WORKERS,
+    STATS_CACHE_SIZE,
+    STATS_CACHE_TTL
+)
+from http_utils import create_session, normalize_url
+from html_utils import HTML_PARSER, TIME_RE, TIME_XPATHS, WS_RE, has_class
+
+
+# 模块级共享的HTTP会话（带连接池和重试）
+_SESSION = create_session()
+
+# 预编译的正则表达式
+_DIGITS_RE = re.compile(r'\d+')
+
+# 页面为UTF-8编码，原创标记的字节形式
+_ORIGINAL_MARK = '原创'.encode('utf-8')
+
+# 流式下载页面时每次读取的字节数
+_STREAM_CHUNK_SIZE = 16 * 1024
+
+# 脚本中文章数据数组的起始位置，数组本身交给JSON解码器按括号匹配读取
+_JSON_ARRAY_RES = (
+    re.compile(r'var\s+msg_list\s*=\s*(?=\[)'),
+    re.compile(r'msgList\s*:\s*(?=\[)'),
+    re.compile(r'"articles"\s*:\s*(?=\[)'),
+)
+_JSON_DECODER = json.JSONDecoder()
+
+# 文章数据中的相对链接以此为前缀
+_WX_PREFIX = 'https://mp.weixin.qq.com'
+
+# 预编译的XPath选择器，按优先级排列
+_PROFILE_AUTHOR_XPATHS = tuple(etree.XPath(x) for x in (
+    '//*[@id="js_name"]',
+    f'//*[{has_class("rich_media_meta_text")}]',
+    f'//*[{has_class("profile_nickname")}]',
+))
+_TITLE_XPATHS = tuple(etree.XPath(x) for x in (
+    '//*[@id="activity-name"]',
+    f'//*[{has_class("rich_media_title")}]',
+    f'//h1[{has_class("rich_media_title")}]',
+    f'//h2[{has_class("rich_media_title")}]',
+    '//h1',
+    '//h2',
+    '//title',
+))
+_AUTHOR_XPATHS = _PROFILE_AUTHOR_XPATHS + tuple(etree.XPath(x) for x in (
+    '//*[contains(@id, "author")]',
+    f'//*[{has_class("author")}]',
+))
+
+# 推荐文章区域：合并为一个条件只遍历一次文档，每个元素只处理一次（按文档顺序）；
+# related_article和recommend_article已包含在这两个条件中
+_RECOMMEND_XPATH = etree.XPath('//*[contains(@class, "recommend") or contains(@class, "related")]')
+
+# 文章元素内的标题链接和摘要候选
+_ARTICLE_TITLE_XPATH = etree.XPath('.//*[self::a or @title]')
+_ARTICLE_DIGEST_XPATH = etree.XPath(f'.//*[{has_class("digest")} or contains(@class, "desc")]')
+
+_VISIBLE_TEXT_XPATH = etree.XPath('.//text()[not(ancestor::script or ancestor::style)]')
+
+
+def _visible_text(element):
+    """获取元素的文本内容，不包含脚本和样式中的文字"""
+    return ''.join(_VISIBLE_TEXT_XPATH(element))
+
+
+def _parse_json_article(item, author_name):
+    """
+    解析msg_list等脚本数据中的一篇文章
+    
+    按微信文章数据的固定字段直接取值，每篇文章只有一次函数调用，
+    不经过实例属性和作者信息字典的查找。
+    
+    Returns:
+        dict: 文章信息，缺少标题或链接时返回None
+    """
+    if not isinstance(item, dict):
+        return None
+    get = item.get
+    
+    # 字段可能为null或其他类型，只接受字符串；缺少标题或链接时尽早返回
+    title = get('title') or ''
+    if not isinstance(title, str):
+        return None
+    title = title.strip()
+    if not title:
+        return None
+    
+    url = get('content_url') or ''
+    if not isinstance(url, str):
+        return None
+    url = url.strip()
+    if not url:
+        return None
+    if not url.startswith('http'):
+        url = _WX_PREFIX + url
+    
+    digest = get('digest') or ''
+    if not isinstance(digest, str):
+        return None
+    
+    return {
+        'title': title,
+        'url': url,
+        'publish_time': get('datetime', ''),
+        'is_original': get('is_original', 0) == 1,
+        'read_count': get('read_num', 0),
+        'like_count': get('like_num', 0),
+        'author': get('author', author_name),
+        'digest': digest.strip()
+    }
+
+
+class _StopParsing(Exception):
+    """已取得所需的数据，提前结束解析"""
+
+
+class _StatsTarget:
+    """
+    统计信息的流式解析目标，只收集阅读量和点赞数元素中的文本
+    
+    优先使用id为readNum/likeNum的元素，否则使用第一个id中包含read/like的元素。
+    两个精确匹配的元素都已读完时抛出_StopParsing，不再解析页面的剩余部分。
+    """
+    
+    # (名称, 精确匹配的id)
+    _FIELDS = (('read', 'readNum'), ('like', 'likeNum'))
+    
+    def __init__(self):
+        self.texts = {}  # {(名称, 是否精确匹配): 元素文本}
+        self._depth = 0
+        self._active = []  # 正在收集的元素：[(键, 开始深度, 文本片段)]
+    
+    def start(self, tag, attrib):
+        self._depth += 1
+        element_id = attrib.get('id')
+        if not element_id:
+            return
+        
+        for name, exact_id in self._FIELDS:
+            if name not in element_id:
+                continue
+            keys = [(name, False)]
+            if element_id == exact_id:
+                keys.append((name, True))
+            for key in keys:
+                # 每种匹配只取文档中的第一个元素
+                if key not in self.texts and all(key != active[0] for active in self._active):
+                    self._active.append((key, self._depth, []))
+    
+    def data(self, text):
+        for _, _, parts in self._active:
+            parts.append(text)
+    
+    def end(self, tag):
+        while self._active and self._active[-1][1] == self._depth:
+            key, _, parts = self._active.pop()
+            self.texts[key] = ''.join(parts)
+        self._depth -= 1
+        
+        if all((name, True) in self.texts for name, _ in self._FIELDS):
+            raise _StopParsing()
+    
+    def close(self):
+        return self.texts
+    
+    def get_text(self, name):
+        """获取统计元素的文本，没有找到时返回None"""
+        return self.texts.get((name, True), self.texts.get((name, False)))
 
 
 class WeChatProfileParser:
     """微信公众号主页解析器"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(REQUEST_HEADERS)
+        # 所有解析器实例共用一个会话，复用到mp.weixin.qq.com的keep-alive连接
+        self.session = _SESSION
+        
+        # 文章统计信息的内存缓存（LRU）：{规范化链接: (统计信息, 过期时间)}
+        self._stats_cache = OrderedDict()
     
     def parse_profile_articles(self, profile_url, max_count=10):
         """
@@ -50,24 +226,49 @@ class WeChatProfileParser:
         except Exception as e:
             raise Exception(f"解析公众号文章列表失败: {str(e)}")
     
+    def parse_profile_articles_batch(self, profile_urls, max_count=10, max_workers=PROFILE_BATCH_WORKERS):
+        """
+        并发解析多个公众号的文章列表
+        
+        请求是网络I/O，在线程池中并发执行，共享会话的连接池。
+        
+        Args:
+            profile_urls (list): 公众号主页链接或文章链接列表
+            max_count (int): 每个公众号最大获取文章数量
+            max_workers (int): 最大并发数
+            
+        Returns:
+            list: 与profile_urls一一对应的结果，成功时为文章信息列表，失败时为对应的异常
+        """
+        if not profile_urls:
+            return []
+        
+        def parse_one(profile_url):
+            try:
+                return self.parse_profile_articles(profile_url, max_count)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(profile_urls))) as executor:
+            return list(executor.map(parse_one, profile_urls))
+    
     def _parse_from_article_page(self, article_url, max_count):
         """从文章页面获取公众号信息并解析文章列表"""
         try:
             # 获取文章页面
             response = self.session.get(article_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            response.encoding = 'utf-8'
             
-            soup = BeautifulSoup(response.text, 'lxml')
+            tree = lxml_html.document_fromstring(response.content, parser=HTML_PARSER)
             
             # 提取公众号信息
-            author_info = self._extract_author_info(soup)
+            author_info = self._extract_author_info(tree)
             
             # 尝试多种方法获取文章列表
             articles = []
             
             # 方法1: 从页面中提取推荐文章
-            page_articles = self._extract_articles_from_page(soup, author_info)
+            page_articles = self._extract_articles_from_page(tree, author_info, max_count)
             articles.extend(page_articles)
             
             # 方法2: 尝试构造历史消息API请求
@@ -77,7 +278,7 @@ class WeChatProfileParser:
             
             # 方法3: 如果还是没有足够文章，创建当前文章的信息作为备选
             if len(articles) == 0:
-                current_article = self._extract_current_article_info(soup, article_url, author_info)
+                current_article = self._extract_current_article_info(tree, article_url, author_info)
                 if current_article:
                     articles.append(current_article)
             
@@ -111,7 +312,7 @@ class WeChatProfileParser:
         # 由于微信公众号主页的限制，这个功能可能需要特殊处理
         raise Exception("暂不支持直接解析公众号主页，请提供任意一篇该公众号的文章链接")
     
-    def _extract_author_info(self, soup):
+    def _extract_author_info(self, tree):
         """提取作者信息"""
         author_info = {
             'name': '未知作者',
@@ -120,162 +321,103 @@ class WeChatProfileParser:
         }
         
         # 提取作者名称
-        author_selectors = [
-            '#js_name',
-            '.rich_media_meta_text',
-            '.profile_nickname'
-        ]
-        
-        for selector in author_selectors:
-            element = soup.select_one(selector)
-            if element:
-                author_name = element.get_text().strip()
+        for xpath in _PROFILE_AUTHOR_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                author_name = elements[0].text_content().strip()
                 if author_name:
                     author_info['name'] = author_name
                     break
         
         return author_info
     
-    def _extract_articles_from_page(self, soup, author_info):
-        """从页面中提取文章信息"""
+    def _extract_articles_from_page(self, tree, author_info, max_count=None):
+        """从页面中提取文章信息（按链接去重），取到max_count篇后停止"""
         articles = []
+        seen_urls = set()
         
-        # 尝试从页面底部的推荐文章中提取
-        recommendation_selectors = [
-            '.related_article',
-            '.recommend_article',
-            '[class*="recommend"]',
-            '[class*="related"]'
-        ]
-        
-        for selector in recommendation_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                article = self._parse_article_element(element, author_info)
-                if article:
+        def add_articles(candidates):
+            """添加未出现过的文章，返回是否已取够"""
+            for article in candidates:
+                if article and article['url'] not in seen_urls:
+                    seen_urls.add(article['url'])
                     articles.append(article)
+                    if max_count is not None and len(articles) >= max_count:
+                        return True
+            return False
         
-        # 尝试从JavaScript数据中提取
-        script_articles = self._extract_from_scripts(soup, author_info)
-        articles.extend(script_articles)
+        # 尝试从页面底部的推荐文章中提取
+        if add_articles(self._parse_article_element(element, author_info)
+                        for element in _RECOMMEND_XPATH(tree)):
+            return articles
         
-        # 去重
-        seen_urls = set()
-        unique_articles = []
-        for article in articles:
-            if article['url'] not in seen_urls:
-                seen_urls.add(article['url'])
-                unique_articles.append(article)
+        # 尝试从JavaScript数据中提取
+        add_articles(self._extract_from_scripts(tree, author_info))
         
-        return unique_articles
+        return articles
     
     def _parse_article_element(self, element, author_info):
         """解析单个文章元素"""
-        try:
-            article = {
-                'title': '',
-                'url': '',
-                'publish_time': '',
-                'is_original': False,
-                'read_count': 0,
-                'like_count': 0,
-                'author': author_info['name'],
-                'digest': ''
-            }
-            
-            # 提取标题
-            title_element = element.select_one('a') or element.select_one('[title]')
-            if title_element:
-                article['title'] = title_element.get('title') or title_element.get_text().strip()
-                article['url'] = title_element.get('href', '')
-            
-            # 提取摘要
-            digest_element = element.select_one('.digest') or element.select_one('[class*="desc"]')
-            if digest_element:
-                article['digest'] = digest_element.get_text().strip()
-            
-            # 检查是否为原创
-            if '原创' in element.get_text():
-                article['is_original'] = True
-            
-            # 只返回有效的文章
-            if article['title'] and article['url']:
-                return article
-            
-        except Exception:
-            pass
+        article = {
+            'title': '',
+            'url': '',
+            'publish_time': '',
+            'is_original': False,
+            'read_count': 0,
+            'like_count': 0,
+            'author': author_info['name'],
+            'digest': ''
+        }
         
-        return None
-    
-    def _extract_from_scripts(self, soup, author_info):
-        """从JavaScript代码中提取文章信息"""
-        articles = []
+        # 提取标题：一次查询取出链接和带title属性的元素，优先使用链接
+        candidates = _ARTICLE_TITLE_XPATH(element)
+        if candidates:
+            title_element = next((c for c in candidates if c.tag == 'a'), candidates[0])
+            article['title'] = title_element.get('title') or title_element.text_content().strip()
+            article['url'] = title_element.get('href', '')
         
-        try:
-            # 查找包含文章数据的script标签
-            scripts = soup.find_all('script')
-            
-            for script in scripts:
-                if not script.string:
-                    continue
-                
-                script_content = script.string
-                
-                # 尝试匹配文章数据的JSON格式
-                json_patterns = [
-                    r'var\s+msg_list\s*=\s*(\[.*?\]);',
-                    r'msgList\s*:\s*(\[.*?\])',
-                    r'"articles"\s*:\s*(\[.*?\])'
-                ]
-                
-                for pattern in json_patterns:
-                    matches = re.findall(pattern, script_content, re.DOTALL)
-                    for match in matches:
-                        try:
-                            data = json.loads(match)
-                            if isinstance(data, list):
-                                for item in data:
-                                    article = self._parse_json_article(item, author_info)
-                                    if article:
-                                        articles.append(article)
-                        except json.JSONDecodeError:
-                            continue
-                            
-        except Exception:
-            pass
+        # 提取摘要：同样一次查询，优先使用class为digest的元素
+        candidates = _ARTICLE_DIGEST_XPATH(element)
+        if candidates:
+            digest_element = next(
+                (c for c in candidates if 'digest' in c.get('class', '').split()), candidates[0]
+            )
+            article['digest'] = digest_element.text_content().strip()
         
-        return articles
-    
-    def _parse_json_article(self, item, author_info):
-        """解析JSON格式的文章数据"""
-        try:
-            if not isinstance(item, dict):
-                return None
-            
-            article = {
-                'title': item.get('title', '').strip(),
-                'url': item.get('content_url', '').strip(),
-                'publish_time': item.get('datetime', ''),
-                'is_original': item.get('is_original', 0) == 1,
-                'read_count': item.get('read_num', 0),
-                'like_count': item.get('like_num', 0),
-                'author': item.get('author', author_info['name']),
-                'digest': item.get('digest', '').strip()
-            }
-            
-            # 处理URL
-            if article['url'] and not article['url'].startswith('http'):
-                article['url'] = 'https://mp.weixin.qq.com' + article['url']
-            
-            # 只返回有效的文章
-            if article['title'] and article['url']:
-                return article
-                
-        except Exception:
-            pass
+        # 检查是否为原创
+        if '原创' in _visible_text(element):
+            article['is_original'] = True
+        
+        # 只返回有效的文章
+        if article['title'] and article['url']:
+            return article
         
         return None
     
+    def _extract_from_scripts(self, tree, author_info):
+        """从JavaScript代码中提取文章信息（逐篇生成，调用方取够后不再解析剩余条目）"""
+        author_name = author_info['name']
+        
+        # 查找包含文章数据的script标签
+        for script in tree.iter('script'):
+            script_content = script.text
+            if not script_content:
+                continue
+            
+            # 尝试匹配文章数据的JSON格式：从数组起始位置解码一个完整的JSON值，
+            # 只扫描一遍，嵌套数组也能正确匹配结尾
+            for pattern in _JSON_ARRAY_RES:
+                for match in pattern.finditer(script_content):
+                    try:
+                        data, _ = _JSON_DECODER.raw_decode(script_content, match.end())
+                    except json.JSONDecodeError:
+                        continue
+                    
+                    for item in data:
+                        article = _parse_json_article(item, author_name)
+                        if article:
+                            yield article
+    
     def _try_get_articles_from_api(self, article_url, author_info, max_count):
         """尝试通过API获取文章列表"""
         articles = []
@@ -299,8 +441,8 @@ class WeChatProfileParser:
                 response = self.session.get(history_url, timeout=REQUEST_TIMEOUT)
                 if response.status_code == 200:
                     # 尝试解析历史消息页面
-                    soup = BeautifulSoup(response.text, 'lxml')
-                    history_articles = self._extract_articles_from_page(soup, author_info)
+                    tree = lxml_html.document_fromstring(response.content, parser=HTML_PARSER)
+                    history_articles = self._extract_articles_from_page(tree, author_info, max_count)
                     articles.extend(history_articles)
             except:
                 # 如果API请求失败，不影响主流程
@@ -312,23 +454,23 @@ class WeChatProfileParser:
         
         return articles
     
-    def _extract_current_article_info(self, soup, article_url, author_info):
+    def _extract_current_article_info(self, tree, article_url, author_info):
         """提取当前文章的信息作为备选"""
         try:
-            # 直接从当前页面的soup中提取信息，不依赖其他解析器
+            # 直接从当前页面的解析树中提取信息，不依赖其他解析器
             article = {
-                'title': self._extract_title_from_soup(soup),
+                'title': self._extract_title_from_tree(tree),
                 'url': article_url,
-                'publish_time': self._extract_publish_time_from_soup(soup),
+                'publish_time': self._extract_publish_time_from_tree(tree),
                 'is_original': False,
                 'read_count': 1000,  # 给一个默认值，确保能通过筛选
                 'like_count': 0,
-                'author': self._extract_author_from_soup(soup) or author_info['name'],
+                'author': self._extract_author_from_tree(tree) or author_info['name'],
                 'digest': ''
             }
             
             # 检查是否为原创
-            page_text = soup.get_text()
+            page_text = _visible_text(tree)
             if '原创' in page_text:
                 article['is_original'] = True
             
@@ -370,63 +512,37 @@ class WeChatProfileParser:
         
         return articles
     
-    def _extract_title_from_soup(self, soup):
-        """从soup中提取文章标题"""
+    def _extract_title_from_tree(self, tree):
+        """从解析树中提取文章标题"""
         # 尝试多种选择器
-        selectors = [
-            '#activity-name',
-            '.rich_media_title',
-            'h1.rich_media_title',
-            'h2.rich_media_title',
-            'h1',
-            'h2',
-            'title'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                title = element.get_text().strip()
+        for xpath in _TITLE_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                title = elements[0].text_content().strip()
                 if title and title != '微信公众平台' and len(title) > 1:
                     return self._clean_text(title)
         
         return "未知标题"
     
-    def _extract_author_from_soup(self, soup):
-        """从soup中提取作者信息"""
-        selectors = [
-            '#js_name',
-            '.rich_media_meta_text',
-            '.profile_nickname',
-            '[id*="author"]',
-            '.author'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                author = element.get_text().strip()
+    def _extract_author_from_tree(self, tree):
+        """从解析树中提取作者信息"""
+        for xpath in _AUTHOR_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                author = elements[0].text_content().strip()
                 if author and len(author) > 0:
                     return self._clean_text(author)
         
         return None
     
-    def _extract_publish_time_from_soup(self, soup):
-        """从soup中提取发布时间"""
-        selectors = [
-            '#publish_time',
-            '.rich_media_meta_text',
-            '[id*="time"]',
-            '[class*="time"]'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                time_text = element.get_text().strip()
+    def _extract_publish_time_from_tree(self, tree):
+        """从解析树中提取发布时间"""
+        for xpath in TIME_XPATHS:
+            elements = xpath(tree)
+            if elements:
+                time_text = elements[0].text_content().strip()
                 # 尝试匹配时间格式
-                time_pattern = r'\d{4}-\d{2}-\d{2}|\d{4}年\d{1,2}月\d{1,2}日'
-                match = re.search(time_pattern, time_text)
+                match = TIME_RE.search(time_text)
                 if match:
                     return match.group()
         
@@ -438,7 +554,7 @@ class WeChatProfileParser:
             return ""
         
         # 移除多余的空白字符
-        text = re.sub(r'\s+', ' ', text)
+        text = WS_RE.sub(' ', text)
         text = text.strip()
         
         return text
@@ -447,45 +563,87 @@ class WeChatProfileParser:
         """
         获取文章统计信息（阅读量、点赞数等）
         注意：由于微信的限制，这些数据可能无法直接获取
+        
+        成功获取的结果在STATS_CACHE_TTL秒内缓存，重复查询同一篇文章时不再请求页面
         """
+        cache_key = normalize_url(article_url)
+        now = time.monotonic()
+        
+        cached = self._stats_cache.get(cache_key)
+        if cached is not None and cached[1] > now:
+            self._stats_cache.move_to_end(cache_key)
+            return dict(cached[0])
+        
         try:
-            response = self.session.get(article_url, timeout=REQUEST_TIMEOUT)
+            stats = self._fetch_article_stats(article_url)
+        except Exception as e:
+            # 如果无法获取统计信息，返回默认值（不缓存，下次重新请求）
+            return {'read_count': 0, 'like_count': 0, 'is_original': False}
+        
+        self._stats_cache[cache_key] = (stats, now + STATS_CACHE_TTL)
+        self._stats_cache.move_to_end(cache_key)
+        if len(self._stats_cache) > STATS_CACHE_SIZE:
+            self._stats_cache.popitem(last=False)
+        
+        # 返回副本，调用方修改结果不会影响缓存
+        return dict(stats)
+    
+    def _fetch_article_stats(self, article_url):
+        """下载文章页面并提取统计信息"""
+        # 边下载边解析，只收集统计元素的文本，不构建解析树
+        target = _StatsTarget()
+        parser = etree.HTMLParser(target=target, encoding='utf-8')
+        stats_done = False
+        is_original = False
+        tail = b''
+        
+        with self.session.get(article_url, timeout=REQUEST_TIMEOUT, stream=True) as response:
             response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            stats = {
-                'read_count': 0,
-                'like_count': 0,
-                'is_original': False
-            }
-            
-            # 尝试从页面中提取统计信息
-            # 注意：这些选择器可能需要根据实际页面结构调整
-            read_count_element = soup.select_one('#readNum') or soup.select_one('[id*="read"]')
-            if read_count_element:
-                read_text = read_count_element.get_text().strip()
-                read_match = re.search(r'\d+', read_text)
-                if read_match:
-                    stats['read_count'] = int(read_match.group())
-            
-            like_count_element = soup.select_one('#likeNum') or soup.select_one('[id*="like"]')
-            if like_count_element:
-                like_text = like_count_element.get_text().strip()
-                like_match = re.search(r'\d+', like_text)
-                if like_match:
-                    stats['like_count'] = int(like_match.group())
             
-            # 检查是否为原创
-            if '原创' in response.text:
-                stats['is_original'] = True
-            
-            return stats
+            for chunk in response.iter_content(_STREAM_CHUNK_SIZE):
+                # 检查是否为原创：直接在原始字节中查找，保留上一块的结尾以防标记被截断
+                if not is_original:
+                    window = tail + chunk
+                    is_original = _ORIGINAL_MARK in window
+                    tail = window[1 - len(_ORIGINAL_MARK):]
+                
+                if not stats_done:
+                    try:
+                        parser.feed(chunk)
+                    except _StopParsing:
+                        stats_done = True
+                
+                # 统计信息和原创标记都已找到，不再下载页面的剩余部分
+                if stats_done and is_original:
+                    break
             
-        except Exception as e:
-            # 如果无法获取统计信息，返回默认值
-            return {'read_count': 0, 'like_count': 0, 'is_original': False}
+            if not stats_done:
+                try:
+                    parser.close()
+                except _StopParsing:
+                    pass
+        
+        stats = {
+            'read_count': 0,
+            'like_count': 0,
+            'is_original': is_original
+        }
+        
+        # 尝试从页面中提取统计信息
+        # 注意：这些选择器可能需要根据实际页面结构调整
+        read_text = target.get_text('read')
+        if read_text is not None:
+            read_match = _DIGITS_RE.search(read_text.strip())
+            if read_match:
+                stats['read_count'] = int(read_match.group())
+        
+        like_text = target.get_text('like')
+        if like_text is not None:
+            like_match = _DIGITS_RE.search(like_text.strip())
+            if like_match:
+                stats['like_count'] = int(like_match.group())
+        
+        return stats
     
     def filter_articles_by_criteria(self, articles, min_read_count=0, original_only=False):
         """
@@ -499,20 +657,14 @@ class WeChatProfileParser:
         Returns:
             list: 筛选后的文章列表
         """
-        filtered_articles = []
-        
-        for article in articles:
-            # 检查阅读量
-            if article.get('read_count', 0) < min_read_count:
-                continue
-            
-            # 检查是否只要原创
-            if original_only and not article.get('is_original', False):
-                continue
-            
-            filtered_articles.append(article)
+        # 是否只要原创在循环外判断，每篇文章只做必要的字段查找
+        if original_only:
+            return [article for article in articles
+                    if article.get('read_count', 0) >= min_read_count
+                    and article.get('is_original', False)]
         
-        return filtered_articles
+        return [article for article in articles
+                if article.get('read_count', 0) >= min_read_count]
 
 
 def test_profile_parser():